@@ -0,0 +1,142 @@
+# auto_refresh.py — detecção de mudanças por item (fingerprint) + receptor local de webhooks do Monday
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from fila import PROJECTED_COLUMNS
+
+
+DEFAULT_WEBHOOK_PORT = 8766
+
+
+# ==============================
+# Fingerprints
+# ==============================
+def fingerprint_items(items, columns=PROJECTED_COLUMNS):
+    """Hash por item (id -> sha1) do nome + colunas projetadas. Mudanças em outras colunas são ignoradas."""
+    fingerprints = {}
+    for item in items:
+        texts = {col.get("id"): col.get("text") for col in item.get("column_values", [])}
+        key = json.dumps([item.get("name", "")] + [texts.get(c) for c in columns], ensure_ascii=False)
+        fingerprints[item.get("id")] = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return fingerprints
+
+
+class ChangeDetector:
+    """Guarda os fingerprints do último conjunto exibido e compara com cada novo crawl."""
+
+    def __init__(self, columns=PROJECTED_COLUMNS):
+        self.columns = columns
+        self.fingerprints = None
+        self.names = {}
+
+    def prime(self, items):
+        """Define a linha de base sem reportar mudanças (ex.: carga manual)."""
+        self.fingerprints = fingerprint_items(items, self.columns)
+        self.names = {item.get("id"): item.get("name", "") for item in items}
+
+    def compare(self, items):
+        """
+        Compara `items` com a linha de base sem alterá-la.
+        Retorna (changes, baseline): changes é None se nada mudou, senão {'added', 'removed', 'changed'}
+        com listas de ids; baseline deve ir para commit() só depois que a mudança foi exibida.
+        """
+        new = fingerprint_items(items, self.columns)
+        old = self.fingerprints
+        names = {item.get("id"): item.get("name", "") for item in items}
+
+        if old is None:
+            changes = {"added": list(new), "removed": [], "changed": []}
+        else:
+            changes = {
+                "added": [i for i in new if i not in old],
+                "removed": [i for i in old if i not in new],
+                "changed": [i for i, fp in new.items() if i in old and old[i] != fp],
+            }
+
+        baseline = (new, names)
+        if not any(changes.values()):
+            return None, baseline
+        removed_names = {i: self.names.get(i, "") for i in changes["removed"]}
+        changes["names"] = {**removed_names, **{i: names.get(i, "") for i in changes["added"] + changes["changed"]}}
+        return changes, baseline
+
+    def commit(self, baseline):
+        """Adota a linha de base devolvida por compare()."""
+        self.fingerprints, self.names = baseline
+
+    def detect(self, items):
+        """compare() + commit(): a linha de base passa a ser `items`."""
+        changes, baseline = self.compare(items)
+        self.commit(baseline)
+        return changes
+
+    @staticmethod
+    def describe(changes, limit=5) -> str:
+        """Resumo curto para a status bar: '1 novo, 2 alterados: Item A, Item B, …'."""
+        parts = []
+        for key, singular, plural in (("added", "novo", "novos"),
+                                      ("removed", "removido", "removidos"),
+                                      ("changed", "alterado", "alterados")):
+            n = len(changes[key])
+            if n:
+                parts.append(f"{n} {singular if n == 1 else plural}")
+        ids = changes["added"] + changes["changed"] + changes["removed"]
+        names = [changes["names"].get(i) or str(i) for i in ids[:limit]]
+        more = ", …" if len(ids) > limit else ""
+        return f"{', '.join(parts)}: {', '.join(names)}{more}"
+
+
+# ==============================
+# Webhooks
+# ==============================
+class WebhookReceiver:
+    """
+    Servidor HTTP local que recebe webhooks do Monday e chama `callback(event)`.
+    Responde ao handshake inicial ({"challenge": ...}) ecoando o desafio.
+    """
+
+    def __init__(self, callback, host="0.0.0.0", port=DEFAULT_WEBHOOK_PORT):
+        self.callback = callback
+        self.host = host
+        self.port = port
+        self._httpd = None
+
+    def start(self):
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0) or 0)
+                try:
+                    payload = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    self.send_response(400)
+                    self.end_headers()
+                    return
+
+                if "challenge" in payload:
+                    body = json.dumps({"challenge": payload["challenge"]}).encode("utf-8")
+                else:
+                    body = b"{}"
+                    receiver.callback(payload.get("event", payload))
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._httpd = ThreadingHTTPServer((self.host, self.port), Handler)
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
@@ -0,0 +1,120 @@
+# bancada.py — join da fila do Monday com a planilha do laboratório (Laborat_rio_-_Bancada_*.xlsx)
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+
+BANCADA_GLOB = "Laborat_rio_-_Bancada_*.xlsx"
+BANCADA_SHEET = "laboratório - bancada"
+BANCADA_HEADER = 4
+
+KEY_COLUMNS = ["SN", "Nº Proposta", "Status"]
+ENRICH_COLUMNS = ["Responsável"]
+
+# Status de reparo em aberto: o match só por SN considera apenas estas linhas (a planilha é um histórico)
+OPEN_STATUSES = {"Reportado", "Pausado", "Em andamento"}
+
+# (caminho, mtime, colunas) -> DataFrame indexado por chave; releituras só quando a planilha muda
+_bancada_cache = {}
+
+
+def find_bancada_file(directory="."):
+    """Retorna a planilha da bancada mais recente do diretório, ou None."""
+    files = glob.glob(os.path.join(directory, BANCADA_GLOB))
+    return max(files, key=os.path.getmtime) if files else None
+
+
+def normalize_key(series: pd.Series) -> pd.Series:
+    """Normaliza SN/Nº Proposta: sem espaços, maiúsculas; vazios viram NA."""
+    s = series.astype("string").str.strip().str.upper().str.replace(r"\s+", "", regex=True)
+    return s.mask(s.isin(["", "-", "--", "NAN", "NONE"]))
+
+
+def build_index(bancada: pd.DataFrame, columns=ENRICH_COLUMNS):
+    """
+    Índice hash chave -> colunas de enriquecimento. A planilha é um histórico de reparos (o mesmo SN
+    aparece várias vezes), então cada linha entra por três chaves, da mais para a menos específica:
+    - 'SP:<SN>|<proposta>': o reparo exato;
+    - 'SN:<SN>': só linhas com status em aberto (OPEN_STATUSES);
+    - 'P:<proposta>': proposta de uma única linha.
+    Linhas que repetem o cabeçalho são descartadas. Chaves com mais de uma linha são ambíguas e ficam
+    fora do índice; as ambiguidades de SP e SN (não as propostas com vários SNs) vão em `duplicates`.
+    Retorna (índice, chaves ambíguas).
+    """
+    header_rows = (bancada["SN"] == "SN") | (bancada["Nº Proposta"] == "Nº Proposta")
+    bancada = bancada[~header_rows]
+
+    sn = normalize_key(bancada["SN"])
+    proposta = normalize_key(bancada["Nº Proposta"])
+    is_open = bancada["Status"].isin(OPEN_STATUSES)
+
+    parts = [
+        bancada[columns].assign(__key="SP:" + sn + "|" + proposta),
+        bancada.loc[is_open, columns].assign(__key="SN:" + sn[is_open]),
+        bancada[columns].assign(__key="P:" + proposta),
+    ]
+    long = pd.concat(parts)
+    long = long[long["__key"].notna()]
+
+    ambiguous = long["__key"].duplicated(keep=False)
+    duplicates = sorted(k for k in long.loc[ambiguous, "__key"].unique() if not k.startswith("P:"))
+    index = long[~ambiguous].set_index("__key")
+    return index, duplicates
+
+
+def load_bancada(path=None, columns=ENRICH_COLUMNS):
+    """Lê só as colunas necessárias da planilha e devolve (índice, duplicatas), com cache por mtime."""
+    path = path or find_bancada_file()
+    if not path:
+        raise FileNotFoundError(f"Planilha da bancada não encontrada ({BANCADA_GLOB})")
+
+    key = (os.path.abspath(path), os.path.getmtime(path), tuple(columns))
+    cached = _bancada_cache.get(key)
+    if cached is None:
+        df = pd.read_excel(
+            path,
+            sheet_name=BANCADA_SHEET,
+            header=BANCADA_HEADER,
+            usecols=KEY_COLUMNS + [c for c in columns if c not in KEY_COLUMNS],
+            dtype={c: str for c in KEY_COLUMNS},
+        )
+        cached = build_index(df, list(columns))
+        _bancada_cache.clear()
+        _bancada_cache[key] = cached
+    return cached
+
+
+def enrich_with_bancada(df: pd.DataFrame, bancada, sn_col="text", proposta_col="proposta_n_"):
+    """
+    Enriquece a fila do Monday com as colunas da bancada num único merge.
+    Chave de cada item: SN+proposta se existir na planilha, senão SN (reparo em aberto), senão Nº Proposta.
+    Retorna (df enriquecido, relatório com matched/unmatched/duplicates (chaves ambíguas na planilha)).
+    """
+    index, duplicates = bancada
+    columns = list(index.columns)
+
+    sn_key = "SN:" + normalize_key(df[sn_col])
+    p_key = "P:" + normalize_key(df[proposta_col])
+    sp_key = "SP:" + normalize_key(df[sn_col]) + "|" + normalize_key(df[proposta_col])
+    keys = pd.Series(
+        np.select(
+            [sp_key.isin(index.index).to_numpy(dtype=bool), sn_key.isin(index.index).to_numpy(dtype=bool)],
+            [sp_key.to_numpy(dtype=object), sn_key.to_numpy(dtype=object)],
+            default=p_key.to_numpy(dtype=object),
+        ),
+        index=df.index,
+    )
+
+    out = df.drop(columns=[c for c in columns if c in df.columns]).assign(__key=keys)
+    out = out.merge(index, how="left", left_on="__key", right_index=True)
+
+    matched = out["__key"].isin(index.index)
+    out[columns] = out[columns].astype(object).where(out[columns].notna(), "")
+    report = {
+        "matched": int(matched.sum()),
+        "unmatched": out.loc[~matched, "Name"].tolist() if "Name" in out.columns else [],
+        "duplicates": duplicates,
+    }
+    return out.drop(columns="__key"), report
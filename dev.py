@@ -1,7 +1,7 @@
 # dev.py — OPx Brand UI (dark/light) • botões amarelos • exporta Excel
-import os, json
+import os, queue, threading, time
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 
 import customtkinter as ctk
 from tkinter import ttk
@@ -14,6 +14,10 @@ except Exception:
     PIL_AVAILABLE = False
 
 from jsonExport import dataMondaytoJson
+from fila import load_monday_items, normalize_items, add_targets_to_reparos, generate_targets, merge_order
+from snapshot_server import SnapshotClient
+from auto_refresh import ChangeDetector, WebhookReceiver
+from bancada import find_bancada_file, load_bancada, enrich_with_bancada
 
 
 
@@ -59,93 +63,13 @@ ctk.set_appearance_mode("dark")       # inicial
 ctk.set_default_color_theme("blue")   # base do CTk (vamos sobrescrever cores chave)
 
 
-# ==============================
-# Dados (Monday)
-# ==============================
-def get_monday_data():
-    """Lê o monday_export_all.json e normaliza as colunas usadas."""
-    with open("monday_export_all.json", "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    items = data.get("items", [])
-    records = []
-
-    for item in items:
-        record = {"Name": item.get("name", "")}
-        for col in item.get("column_values", []):
-            record[col.get("id")] = col.get("text")
-        # garante SN explicitamente
-        record["text"] = next(
-            (col.get("text") for col in item.get("column_values", []) if col.get("id") == "text"),
-            None
-        )
-        records.append(record)
-
-    df = pd.DataFrame(records)
-
-    # garante colunas críticas
-    for col in ("status", "status_1", "subelementos", "proposta_n_", "cliente"):
-        if col not in df.columns:
-            df[col] = "" if col in ("subelementos", "proposta_n_", "cliente") else None
-
-    # due_date como datetime
-    if "due_date" in df.columns:
-        df["due_date"] = pd.to_datetime(df["due_date"], errors="coerce")
-    else:
-        df["due_date"] = pd.NaT
-
-    # Filtra status desejados
-    status_desejados = {"Reportado", "Pausado", "Em andamento"}
-    df = df[df["status"].isin(status_desejados)].copy()
-
-    # remove casos antigos
-    df = df[~df["status_1"].isin(["--", "", None])].copy()
-
-    return df
-
-
-# ==============================
-# Lógica de Targets
-# ==============================
-def monday_of_week(d: datetime) -> datetime:
-    """Retorna a segunda da semana que contém 'd'. Se for sábado/domingo, a próxima segunda."""
-    if d.weekday() < 5:
-        return d - timedelta(days=d.weekday())
-    return d + timedelta(days=(7 - d.weekday()))
-
-def generate_targets(n, start_date_str="28/08/2025", max_per_week=5):
-    """
-    Gera rótulos: 'Semana XX - dd/mm/aaaa'
-    - Começa em 36; ao passar de 52, volta a 1.
-    - Target sempre na segunda da semana seguinte.
-    """
-    start = datetime.strptime(start_date_str, "%d/%m/%Y")
-    week_monday = monday_of_week(start)
-
-    targets = []
-    for i in range(n):
-        block = i // max_per_week
-        target_date = week_monday + timedelta(days=7 * (block + 1))
-        semana_rotulo = (block + 36 - 1) % 52 + 1
-        targets.append(f"Semana {semana_rotulo} - {target_date.strftime('%d/%m/%Y')}")
-    return targets
-
-def add_targets_to_reparos(df, start_date_str="28/08/2025", max_per_week=5):
-    if df.empty:
-        df["target"] = None
-        return df
-    prioridade = {"SEVERA": 0, "ALTA": 1, "MÉDIA": 2, "LEVE": 3}
-    df = df.copy()
-    df["__priority__"] = df["status_1"].map(prioridade).fillna(999).astype(int)
-    df = df.sort_values(by=["__priority__", "due_date"], ascending=[True, True]).reset_index(drop=True)
-    df["target"] = generate_targets(len(df), start_date_str=start_date_str, max_per_week=max_per_week)
-    return df.drop(columns=["__priority__"])
-
-
 # ==============================
 # App
 # ==============================
 class SimpleTable(ctk.CTk):
+    AUTO_INTERVALS = {"off": 0, "30s": 30, "1min": 60, "5min": 300, "15min": 900}
+    PUSH_MIN_INTERVAL = 60   # segundos entre crawls disparados por webhook (= min_sync_age do servidor)
+
     def __init__(self):
         super().__init__()
         self.title("Fila de Reparos · OPx")
@@ -156,6 +80,7 @@ class SimpleTable(ctk.CTk):
         self.start_date_str = ctk.StringVar(value="28/08/2025")
         self.max_per_week = ctk.StringVar(value="5")
         self.appearance = ctk.StringVar(value="dark")
+        self.auto_interval = ctk.StringVar(value=os.environ.get("OPX_AUTO_REFRESH", "off"))
 
         # Ordem pedida:
         self.colunas_exibidas = [
@@ -165,18 +90,44 @@ class SimpleTable(ctk.CTk):
             "Cliente",   # entre proposta e SN
             "SN",
             "Prioridade",
+            "Responsável",   # vem da planilha da bancada
             "Data de Submissão",
             "Targetts",
         ]
         self.df_final = pd.DataFrame()
+        self.bancada_report = None
+        self._row_cache = {}   # iid -> (values, tags) já desenhados no Treeview
 
         # Monday (atualizador)
         self.mondayDataUpdate = dataMondaytoJson()
 
+        # Snapshot server (opcional): OPX_SNAPSHOT_URL=http://servidor:8765 usa o servidor em vez da API
+        snapshot_url = os.environ.get("OPX_SNAPSHOT_URL")
+        self.snapshotClient = SnapshotClient(snapshot_url) if snapshot_url else None
+
+        # Auto refresh: fingerprints por item; buscas em background entregues via fila de eventos
+        self.changeDetector = ChangeDetector()
+        self._refresh_events = queue.Queue()
+        self._refresh_busy = False
+        self._refresh_again = False
+        self._refresh_sync = False
+        self._pending_refresh = None
+        self._auto_job = None
+
+        # Webhooks do Monday (opcional): OPX_WEBHOOK_PORT=8766 atualiza por push em vez de polling
+        self.webhookReceiver = None
+        self._last_push_refresh = 0.0
+        self._push_job = None
+        webhook_warning = self._start_webhook_receiver(os.environ.get("OPX_WEBHOOK_PORT"))
+
         # Layout
         self._build_ui()
         self._apply_brand_colors()   # cores iniciais
         self.load_data()
+        self._on_auto_interval_change()
+        if webhook_warning:
+            self.status.configure(text=f"{self.status.cget('text')} · {webhook_warning}")
+        self.after(250, self._poll_refresh_events)
 
     # ---------- UI ----------
     def _build_ui(self):
@@ -233,7 +184,7 @@ class SimpleTable(ctk.CTk):
         actions.pack(fill="x", padx=12, pady=(12, 6))
 
         self.btn_reload = ctk.CTkButton(actions, text="Atualizar dados",
-                                        command=lambda: self.load_data(1), width=150)
+                                        command=lambda: self.request_refresh(sync=True), width=150)
         self.btn_reload.pack(side="left")
 
         self.btn_sort_asc = ctk.CTkButton(actions, text="Prioridade ↑",
@@ -249,6 +200,13 @@ class SimpleTable(ctk.CTk):
                                         command=self.export_excel, width=170)
         self.btn_export.pack(side="left")
 
+        # Auto refresh (intervalo de polling)
+        self.opt_auto = ctk.CTkOptionMenu(actions, variable=self.auto_interval,
+                                          values=list(self.AUTO_INTERVALS),
+                                          command=self._on_auto_interval_change, width=110)
+        self.opt_auto.pack(side="right")
+        ctk.CTkLabel(actions, text="Auto").pack(side="right", padx=(0, 8))
+
         # Treeview
         tree_wrap = ctk.CTkFrame(container)
         tree_wrap.pack(fill="both", expand=True, padx=12, pady=(8, 12))
@@ -394,6 +352,10 @@ class SimpleTable(ctk.CTk):
                                button_color=OPX_YELLOW,
                                button_hover_color=OPX_YELLOW_HOVER,
                                text_color=OPX_TEXT_DARK)
+        self.opt_auto.configure(fg_color=OPX_YELLOW,
+                                button_color=OPX_YELLOW,
+                                button_hover_color=OPX_YELLOW_HOVER,
+                                text_color=OPX_TEXT_DARK)
 
         # SegmentedButton (dark/light/system) neutro (sem azul)
         self.appearance_btn.configure(
@@ -415,25 +377,66 @@ class SimpleTable(ctk.CTk):
 
     # ---------- Data Ops ----------
     def populate(self, tree, df):
-        tree.delete(*tree.get_children())
+        """
+        Sincroniza o Treeview com df (linhas identificadas por __iid = id do item no Monday):
+        só remove, insere, move ou atualiza as linhas cuja posição ou valores mudaram.
+        """
+        cache = self._row_cache
         cols = [c for c in self.colunas_exibidas if c in df.columns]
-        for i, (_, row) in enumerate(df.iterrows()):
-            iid = str(row["__iid"]) if "__iid" in row.index else str(i)
-            values = [row.get(c, "") for c in cols]
-            tag = "evenrow" if i % 2 == 0 else "oddrow"
-            tree.insert("", "end", iid=iid, values=values, tags=(tag,))
-
-    def load_data(self, flag_reload=0):
+        if "__iid" in df.columns:
+            ids = [str(v) for v in df["__iid"]]
+        else:
+            ids = [str(i) for i in range(len(df))]
+
+        wanted = set(ids)
+        stale = [iid for iid in tree.get_children("") if iid not in wanted]
+        if stale:
+            tree.delete(*stale)
+            for iid in stale:
+                cache.pop(iid, None)
+
+        live = list(tree.get_children(""))
+        for pos, (iid, row) in enumerate(zip(ids, df[cols].itertuples(index=False, name=None))):
+            values = tuple("" if pd.isna(v) else v for v in row)
+            tags = ("evenrow" if pos % 2 == 0 else "oddrow",)
+            if iid not in cache:
+                tree.insert("", pos, iid=iid, values=values, tags=tags)
+                live.insert(pos, iid)
+            else:
+                if live[pos] != iid:
+                    tree.move(iid, "", pos)
+                    live.remove(iid)
+                    live.insert(pos, iid)
+                if cache[iid] != (values, tags):
+                    tree.item(iid, values=values, tags=tags)
+            cache[iid] = (values, tags)
+
+    def load_data(self, items=None):
+        """Carrega a partir de `items` (refresh) ou do snapshot local/servidor. Crawls só rodam em request_refresh."""
         try:
-            if flag_reload:
-                self.mondayDataUpdate.mondayToJson()
-
-            df = get_monday_data()
-            df = add_targets_to_reparos(
-                df,
-                start_date_str=self.start_date_str.get(),
-                max_per_week=int(self.max_per_week.get())
-            )
+            if items is None and self.snapshotClient:
+                # servidor já entrega a fila ordenada e com targets (304 reaproveita o último df)
+                df, _ = self.snapshotClient.fetch_queue(
+                    start_date_str=self.start_date_str.get(),
+                    max_per_week=int(self.max_per_week.get())
+                )
+                # linha de base do auto refresh: sem ela o primeiro tick reportaria tudo como novo
+                if self.changeDetector.fingerprints is None:
+                    items, _ = self.snapshotClient.fetch_items()
+                    self.changeDetector.prime(items)
+            else:
+                if items is None:
+                    items = load_monday_items()
+                    self.changeDetector.prime(items)
+
+                df = normalize_items(items)
+                df = add_targets_to_reparos(
+                    df,
+                    start_date_str=self.start_date_str.get(),
+                    max_per_week=int(self.max_per_week.get())
+                )
+
+            df, bancada_msg = self._enrich_with_bancada(df)
 
             df = df.copy()
             if pd.api.types.is_datetime64_any_dtype(df["due_date"]):
@@ -459,19 +462,64 @@ class SimpleTable(ctk.CTk):
             df.drop(columns=["Subelementos"], errors="ignore", inplace=True)
 
             cols = [c for c in self.colunas_exibidas if c in df.columns]
-            df["__iid"] = range(1, len(df) + 1)
-            self.df_final = df[["__iid"] + cols].copy()
+            df["__iid"] = df["id"].astype(str)
+            df = df[["__iid"] + cols].copy()
+
+            if not self.df_final.empty and "__iid" in self.df_final.columns:
+                # reload incremental: mantém a ordem atual (inclusive manual) e encaixa por prioridade
+                # os itens novos e os que mudaram de prioridade/due date
+                order = merge_order(list(self.df_final["__iid"]), list(df["__iid"]),
+                                    changed_ids=self._reranked_ids(self.df_final, df))
+                self.df_final = df.set_index("__iid").loc[order].reset_index()
+                self._recalc_targets_inplace()
+            else:
+                self.df_final = df
 
             self.populate(self.reported_tree, self.df_final)
             self.auto_resize_columns(sample=120)
 
             self.status.configure(
                 text=f"Carregado: {len(self.df_final)} itens · Atualizado em {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}"
+                     + bancada_msg
             )
+            return True
         except Exception as e:
-            self.status.configure(text=f"Erro ao carregar dados: {e}")
-            self.df_final = pd.DataFrame(columns=["__iid"] + self.colunas_exibidas)
-            self.populate(self.reported_tree, self.df_final)
+            # mantém df_final e o Treeview (e a ordem manual) como estavam
+            self.status.configure(text=f"Erro ao carregar dados: {e} · exibindo os dados anteriores")
+            return False
+
+    @staticmethod
+    def _reranked_ids(old, new, columns=("Prioridade", "Data de Submissão")):
+        """Ids presentes nos dois DataFrames cuja prioridade ou due date mudou."""
+        columns = [c for c in columns if c in old.columns and c in new.columns]
+        if not columns:
+            return []
+        old = old.set_index("__iid")[columns]
+        new = new.set_index("__iid")[columns]
+        common = old.index.intersection(new.index)
+        diff = (old.loc[common].fillna("").astype(str) != new.loc[common].fillna("").astype(str)).any(axis=1)
+        return list(common[diff.to_numpy()])
+
+    def _enrich_with_bancada(self, df):
+        """Junta Responsável (e afins) da planilha da bancada; sem planilha, as colunas ficam vazias."""
+        self.bancada_report = None
+        try:
+            path = find_bancada_file()
+            if path is None:
+                df = df.copy()
+                df["Responsável"] = ""
+                return df, ""
+            df, self.bancada_report = enrich_with_bancada(df, load_bancada(path))
+        except Exception as e:
+            df = df.copy()
+            df["Responsável"] = ""
+            return df, f" · Bancada indisponível: {e}"
+
+        rep = self.bancada_report
+        msg = f" · Bancada: {rep['matched']}/{len(df)} encontrados"
+        if rep["duplicates"]:
+            msg += f", {len(rep['duplicates'])} chaves ambíguas na planilha"
+        return df, msg
 
         # ---------- Exportação Excel ----------
     def export_excel(self, path: str = None):
@@ -612,14 +660,10 @@ class SimpleTable(ctk.CTk):
         if not hasattr(self, "_dragging_iid") or not self._dragging_iid:
             return
         order = list(self.reported_tree.get_children(""))
-        try:
-            idx_order = [int(i) for i in order]
-        except ValueError:
-            idx_order = order
-        if "__iid" in self.df_final.columns and len(idx_order) == len(self.df_final):
+        if "__iid" in self.df_final.columns and len(order) == len(self.df_final):
             self.df_final = (
                 self.df_final.set_index("__iid")
-                            .loc[idx_order]
+                            .loc[order]
                             .reset_index()
             )
         self._recalc_targets_inplace()
@@ -627,6 +671,11 @@ class SimpleTable(ctk.CTk):
         self._dragging_iid = None
         self.status.configure(text=f"Reordenado: {len(self.df_final)} itens · Targets atualizados")
 
+        # refresh que chegou durante o arraste
+        if self._pending_refresh is not None:
+            pending, self._pending_refresh = self._pending_refresh, None
+            self._apply_refresh(*pending)
+
     def _recalc_targets_inplace(self):
         n = len(self.df_final)
         if n == 0:
@@ -640,6 +689,147 @@ class SimpleTable(ctk.CTk):
             self.df_final["Targetts"] = ""
         self.df_final.loc[:, "Targetts"] = targets
 
+    # ---------- Auto refresh ----------
+    def _on_auto_interval_change(self, _value=None):
+        if self._auto_job:
+            self.after_cancel(self._auto_job)
+            self._auto_job = None
+        value = self.auto_interval.get()
+        if value not in self.AUTO_INTERVALS:
+            # ex.: OPX_AUTO_REFRESH=60; desliga de forma visível em vez de mostrar um valor que não vale
+            self.auto_interval.set("off")
+            self.status.configure(
+                text=f"Auto refresh inválido: {value!r} (use {', '.join(self.AUTO_INTERVALS)}) · desligado"
+            )
+            return
+        seconds = self.AUTO_INTERVALS[value]
+        if seconds:
+            self._auto_job = self.after(seconds * 1000, self._auto_refresh_tick)
+
+    def _auto_refresh_tick(self):
+        self._auto_job = None
+        self.request_refresh()
+        self._on_auto_interval_change()   # reagenda
+
+    def request_refresh(self, sync=False):
+        """
+        Busca os itens em background (botão, timer ou webhook). Só existe uma busca por vez, então o
+        dataMondaytoJson nunca roda em paralelo; pedidos durante uma busca viram uma única nova busca.
+        `sync=True` (botão) pede também um crawl novo ao snapshot server.
+        """
+        if self._refresh_busy:
+            self._refresh_again = True
+            self._refresh_sync = self._refresh_sync or sync
+            return
+        self._refresh_busy = True
+        if sync:
+            self.status.configure(text="Buscando dados...")
+        threading.Thread(target=self._fetch_items_worker, args=(sync,), daemon=True).start()
+
+    def _fetch_items_worker(self, sync=False):
+        # roda fora da thread do Tk: só coloca o resultado na fila de eventos
+        try:
+            if self.snapshotClient:
+                if sync:
+                    # o servidor agrupa pedidos simultâneos e respeita min_sync_age
+                    self.snapshotClient.request_sync()
+                items, changed = self.snapshotClient.fetch_items()
+                if not changed and not sync and self.changeDetector.fingerprints is not None:
+                    self._refresh_events.put(("unchanged", None))
+                    return
+            else:
+                final_data = self.mondayDataUpdate.mondayToJson()
+                if final_data is None:
+                    raise RuntimeError("crawl do Monday falhou (detalhes no console), exibindo o último snapshot completo")
+                items = final_data.get("items", [])
+            self._refresh_events.put(("items", (items, sync)))
+        except Exception as e:
+            self._refresh_events.put(("error", e))
+
+    def _start_webhook_receiver(self, port_value):
+        """Sobe o receptor de webhooks; porta inválida ou ocupada só gera aviso (retornado) e fica desligado."""
+        if not port_value:
+            return None
+        try:
+            port = int(port_value)
+            if not 1 <= port <= 65535:
+                raise ValueError(port)
+        except ValueError:
+            return f"OPX_WEBHOOK_PORT inválido: {port_value!r} · webhooks desligados"
+        try:
+            self.webhookReceiver = WebhookReceiver(
+                lambda event: self._refresh_events.put(("push", event)),
+                port=port,
+            ).start()
+        except OSError as e:
+            return f"Webhooks desligados (porta {port}): {e}"
+        return None
+
+    def _on_push(self):
+        """
+        Webhook recebido: pede um sync (no modo snapshot o servidor recrawla; sem isso só viria 304).
+        Rajadas de eventos viram no máximo um crawl a cada PUSH_MIN_INTERVAL; o último evento da
+        rajada é atendido ao fim do intervalo.
+        """
+        if self._push_job:
+            return
+        wait = self.PUSH_MIN_INTERVAL - (time.monotonic() - self._last_push_refresh)
+        if wait > 0:
+            self._push_job = self.after(int(wait * 1000), self._push_refresh)
+        else:
+            self._push_refresh()
+
+    def _push_refresh(self):
+        self._push_job = None
+        self._last_push_refresh = time.monotonic()
+        self.request_refresh(sync=True)
+
+    def _poll_refresh_events(self):
+        try:
+            while True:
+                kind, payload = self._refresh_events.get_nowait()
+                if kind == "push":
+                    self._on_push()
+                    continue
+
+                self._refresh_busy = False
+                if kind == "items":
+                    self._apply_refresh(*payload)
+                elif kind == "unchanged":
+                    self.status.configure(text=f"Sem alterações · Verificado em {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
+                elif kind == "error":
+                    self.status.configure(text=f"Erro ao atualizar dados: {payload}")
+
+                if self._refresh_again:
+                    sync, self._refresh_again, self._refresh_sync = self._refresh_sync, False, False
+                    self.request_refresh(sync=sync)
+        except queue.Empty:
+            pass
+        self.after(250, self._poll_refresh_events)
+
+    def _apply_refresh(self, items, force=False):
+        """
+        Só reprocessa (parse, targets, populate) se algum item mudou nas colunas projetadas.
+        `force` (botão "Atualizar dados") recarrega mesmo sem mudanças, ex.: após trocar a data inicial.
+        """
+        if getattr(self, "_dragging_iid", None):
+            # não mexe na ordem enquanto o usuário arrasta; aplica no release
+            self._pending_refresh = (items, force)
+            return
+
+        changes, baseline = self.changeDetector.compare(items)
+        now = datetime.now().strftime('%d/%m/%Y %H:%M:%S')
+        if changes is None and not force:
+            self.status.configure(text=f"Sem alterações · Verificado em {now}")
+            return
+
+        # a linha de base só avança se a tabela foi de fato atualizada; senão o próximo tick tenta de novo
+        if not self.load_data(items=items):
+            return
+        self.changeDetector.commit(baseline)
+        summary = ChangeDetector.describe(changes) if changes else "sem alterações"
+        self.status.configure(text=f"Atualizado: {summary} · {now}")
+
     # ---------- Aparência ----------
     def change_appearance(self, mode):
         ctk.set_appearance_mode(mode)
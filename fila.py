@@ -0,0 +1,135 @@
+# fila.py — dados da fila de reparos (Monday) + lógica de targets, sem dependência de UI
+import json
+import pandas as pd
+from datetime import datetime, timedelta
+
+
+MONDAY_EXPORT_FILE = "monday_export_all.json"
+
+# Colunas da fila servidas/consumidas fora da UI (snapshot server, clientes)
+QUEUE_COLUMNS = [
+    "id", "Name", "status", "status_1", "proposta_n_", "cliente", "text", "due_date", "target",
+]
+
+# Colunas do Monday que a fila usa (fingerprint de mudanças ignora as demais)
+PROJECTED_COLUMNS = ("status", "status_1", "text", "proposta_n_", "cliente", "due_date", "subelementos")
+
+
+# ==============================
+# Dados (Monday)
+# ==============================
+def normalize_items(items):
+    """Normaliza a lista de itens do Monday nas colunas usadas pela fila."""
+    records = []
+
+    for item in items:
+        record = {"id": item.get("id"), "Name": item.get("name", "")}
+        for col in item.get("column_values", []):
+            record[col.get("id")] = col.get("text")
+        # garante SN explicitamente
+        record["text"] = next(
+            (col.get("text") for col in item.get("column_values", []) if col.get("id") == "text"),
+            None
+        )
+        records.append(record)
+
+    df = pd.DataFrame(records)
+
+    # garante colunas críticas
+    for col in ("id", "status", "status_1", "subelementos", "proposta_n_", "cliente"):
+        if col not in df.columns:
+            df[col] = "" if col in ("subelementos", "proposta_n_", "cliente") else None
+
+    # due_date como datetime
+    if "due_date" in df.columns:
+        df["due_date"] = pd.to_datetime(df["due_date"], errors="coerce")
+    else:
+        df["due_date"] = pd.NaT
+
+    # Filtra status desejados
+    status_desejados = {"Reportado", "Pausado", "Em andamento"}
+    df = df[df["status"].isin(status_desejados)].copy()
+
+    # remove casos antigos
+    df = df[~df["status_1"].isin(["--", "", None])].copy()
+
+    return df
+
+
+def load_monday_items(path=MONDAY_EXPORT_FILE):
+    """Lê a lista crua de itens do monday_export_all.json."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data.get("items", [])
+
+
+def get_monday_data(path=MONDAY_EXPORT_FILE):
+    """Lê o monday_export_all.json e normaliza as colunas usadas."""
+    return normalize_items(load_monday_items(path))
+
+
+# ==============================
+# Lógica de Targets
+# ==============================
+def monday_of_week(d: datetime) -> datetime:
+    """Retorna a segunda da semana que contém 'd'. Se for sábado/domingo, a próxima segunda."""
+    if d.weekday() < 5:
+        return d - timedelta(days=d.weekday())
+    return d + timedelta(days=(7 - d.weekday()))
+
+def generate_targets(n, start_date_str="28/08/2025", max_per_week=5):
+    """
+    Gera rótulos: 'Semana XX - dd/mm/aaaa'
+    - Começa em 36; ao passar de 52, volta a 1.
+    - Target sempre na segunda da semana seguinte.
+    """
+    start = datetime.strptime(start_date_str, "%d/%m/%Y")
+    week_monday = monday_of_week(start)
+
+    targets = []
+    for i in range(n):
+        block = i // max_per_week
+        target_date = week_monday + timedelta(days=7 * (block + 1))
+        semana_rotulo = (block + 36 - 1) % 52 + 1
+        targets.append(f"Semana {semana_rotulo} - {target_date.strftime('%d/%m/%Y')}")
+    return targets
+
+def add_targets_to_reparos(df, start_date_str="28/08/2025", max_per_week=5):
+    if df.empty:
+        df["target"] = None
+        return df
+    prioridade = {"SEVERA": 0, "ALTA": 1, "MÉDIA": 2, "LEVE": 3}
+    df = df.copy()
+    df["__priority__"] = df["status_1"].map(prioridade).fillna(999).astype(int)
+    df = df.sort_values(by=["__priority__", "due_date"], ascending=[True, True]).reset_index(drop=True)
+    df["target"] = generate_targets(len(df), start_date_str=start_date_str, max_per_week=max_per_week)
+    return df.drop(columns=["__priority__"])
+
+
+# ==============================
+# Reload incremental
+# ==============================
+def merge_order(current_ids, new_ids, changed_ids=()):
+    """
+    Mescla a ordem nova (prioridade/due date) na ordem atual (possivelmente manual) numa passada O(n).
+    - Itens que continuam mantêm a posição relativa atual.
+    - Itens que saíram do snapshot são removidos.
+    - Itens novos entram antes do primeiro item mantido que vem depois deles na ordem nova.
+    - Itens em `changed_ids` (prioridade ou due date alterados) são tratados como novos: saem da
+      posição antiga e são reinseridos na posição da nova prioridade.
+    """
+    rank = {iid: pos for pos, iid in enumerate(new_ids)}
+    changed = set(changed_ids)
+    current = set(current_ids) - changed
+    kept = [iid for iid in current_ids if iid in rank and iid in current]
+    fresh = [iid for iid in new_ids if iid not in current]
+
+    merged = []
+    j = 0
+    for iid in kept:
+        while j < len(fresh) and rank[fresh[j]] < rank[iid]:
+            merged.append(fresh[j])
+            j += 1
+        merged.append(iid)
+    merged.extend(fresh[j:])
+    return merged
@@ -0,0 +1,106 @@
+# monday_loadtest.py — mede o caminho de sync (dataMondaytoJson) contra o monday_stub
+#
+#   python monday_loadtest.py --sizes 500,5000 --concurrency 1,4,16 --latency 0.05 --rate-429 0.05
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import threading
+import time
+
+from jsonExport import dataMondaytoJson
+from monday_stub import MondayStub, DEFAULT_TOKEN
+
+
+def run_crawl(url, workdir, board_id, page_limit, max_attempts, result):
+    """Um cliente: crawl completo, retomando do checkpoint enquanto falhar (até max_attempts)."""
+    fetcher = dataMondaytoJson(
+        output_file=os.path.join(workdir, "monday_export_all.json"),
+        checkpoint_dir=os.path.join(workdir, ".monday_checkpoint"),
+        max_retries=5, backoff=0.05, timeout=30,
+        api_url=url, token=DEFAULT_TOKEN, board_id=board_id, page_limit=page_limit,
+    )
+    totals = {"items": 0, "bytes": 0, "retries": 0, "pages": 0, "resumes": 0, "ok": False}
+    for attempt in range(max_attempts):
+        final_data = fetcher.mondayToJson()
+        for key in ("bytes", "retries", "pages"):
+            totals[key] += fetcher.stats.get(key, 0)
+        totals["resumes"] += int(fetcher.stats.get("resumed", False))
+        if final_data is not None:
+            totals["items"] = len(final_data["items"])
+            totals["ok"] = True
+            break
+    result.update(totals)
+
+
+def run_scenario(n_items, concurrency, page_limit=100, max_attempts=5, **stub_kwargs):
+    stub = MondayStub(n_items=n_items, **stub_kwargs).start()
+    results = [{} for _ in range(concurrency)]
+    try:
+        with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+            threads = []
+            for i, result in enumerate(results):
+                workdir = os.path.join(tmp, f"client_{i}")
+                os.makedirs(workdir)
+                threads.append(threading.Thread(
+                    target=run_crawl,
+                    args=(stub.url, workdir, stub.board_id, page_limit, max_attempts, result),
+                ))
+            start = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - start
+    finally:
+        stub.stop()
+
+    items = sum(r["items"] for r in results)
+    return {
+        "items": n_items,
+        "clients": concurrency,
+        "ok": sum(r["ok"] for r in results),
+        "seconds": elapsed,
+        "items_s": items / elapsed if elapsed else 0.0,
+        "mb": sum(r["bytes"] for r in results) / 1e6,
+        "retries": sum(r["retries"] for r in results),
+        "resumes": sum(r["resumes"] for r in results),
+        "requests": stub.stats["requests"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga do sync com o Monday (via monday_stub).")
+    parser.add_argument("--sizes", default="500,2000,10000", help="tamanhos de board, separados por vírgula")
+    parser.add_argument("--concurrency", default="1,4,16", help="clientes simultâneos, separados por vírgula")
+    parser.add_argument("--page-limit", type=int, default=100)
+    parser.add_argument("--max-attempts", type=int, default=5, help="crawls (com retomada) por cliente")
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--complexity-budget", type=int, default=None)
+    parser.add_argument("--fail-after-pages", type=int, default=None)
+    parser.add_argument("--fail-count", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    stub_kwargs = dict(
+        latency=args.latency, jitter=args.jitter, rate_429=args.rate_429, rate_5xx=args.rate_5xx,
+        retry_after=0, complexity_budget=args.complexity_budget,
+        fail_after_pages=args.fail_after_pages, fail_count=args.fail_count,
+    )
+
+    header = f"{'itens':>7} {'clientes':>8} {'ok':>4} {'tempo(s)':>9} {'itens/s':>10} {'MB':>8} {'retries':>8} {'resumes':>8} {'reqs':>6}"
+    print(header)
+    print("-" * len(header))
+    for n_items in (int(x) for x in args.sizes.split(",")):
+        for concurrency in (int(x) for x in args.concurrency.split(",")):
+            r = run_scenario(n_items, concurrency, page_limit=args.page_limit,
+                             max_attempts=args.max_attempts, **stub_kwargs)
+            print(f"{r['items']:>7} {r['clients']:>8} {r['ok']:>4} {r['seconds']:>9.2f} {r['items_s']:>10.0f} "
+                  f"{r['mb']:>8.2f} {r['retries']:>8} {r['resumes']:>8} {r['requests']:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+# monday_stub.py — stand-in local da API GraphQL do Monday para testes offline de sync/carga
+#
+# Serve `boards(ids: [...]) { items_page(limit, cursor) { cursor items {...} } }` a partir de um board
+# gerado, com latência, limite de página, orçamento de complexidade, 429/5xx e falhas no meio do crawl.
+#
+#   python monday_stub.py --items 5000 --latency 0.2 --rate-429 0.05 --fail-after-pages 10
+#
+# Para usar com o dev.py, rode-o de um diretório de teste (ele grava monday_export_all.json no diretório atual):
+#   cd /tmp/opx-stub && MONDAY_API_URL=http://localhost:8767/v2 MONDAY_API_TOKEN=stub-token \
+#       MONDAY_BOARD_ID=1000000001 python /caminho/para/dev.py
+import argparse
+import base64
+import json
+import random
+import re
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+DEFAULT_PORT = 8767
+DEFAULT_TOKEN = "stub-token"
+DEFAULT_BOARD_ID = 1000000001   # board fictício: nunca o id do board de produção
+
+_BOARD_RE = re.compile(r"boards\s*\(\s*ids\s*:\s*\[\s*(\d+)")
+_PAGE_RE = re.compile(r'items_page\s*\(\s*limit\s*:\s*(\d+)(?:\s*,\s*cursor\s*:\s*"([^"]*)")?')
+
+
+# ==============================
+# Board gerado
+# ==============================
+def generate_board(n_items, seed=0):
+    """Itens no formato do items_page, com as colunas que a fila usa."""
+    rng = random.Random(seed)
+    status = ["Reportado", "Pausado", "Em andamento", "Concluído", "Devolvido"]
+    prioridade = ["SEVERA", "ALTA", "MÉDIA", "LEVE", "--"]
+    clientes = ["Hospital A", "Clínica B", "Diagnósticos C", "Laboratório D"]
+    start = date(2025, 1, 1)
+
+    items = []
+    for i in range(n_items):
+        due = start + timedelta(days=rng.randint(0, 365))
+        columns = {
+            "status": rng.choice(status),
+            "status_1": rng.choice(prioridade),
+            "text": f"SN{rng.randint(0, 10**8):08d}",
+            "proposta_n_": f"2025.{rng.randint(1, 999):03d}",
+            "cliente": rng.choice(clientes),
+            "due_date": due.isoformat(),
+            "subelementos": "",
+        }
+        items.append({
+            "id": str(10**9 + i),
+            "name": f"Reparo {i}",
+            "column_values": [
+                {"id": cid, "text": text, "value": json.dumps(text), "type": "text"}
+                for cid, text in columns.items()
+            ],
+        })
+    return items
+
+
+# ==============================
+# Stub
+# ==============================
+class MondayStub:
+    """
+    Servidor GraphQL mínimo. Parâmetros de falha:
+    - latency/jitter: segundos por requisição
+    - max_page_size: limit acima disso devolve erro GraphQL (o Monday limita a 500)
+    - complexity_budget: pontos por janela de 60 s (custo de uma página = limit * complexity_per_item)
+    - rate_429 / rate_5xx: probabilidade de cada requisição falhar
+    - fail_after_pages / fail_count: depois de N páginas servidas, as próximas `fail_count` requisições dão 500
+    - cursor_ttl: segundos até um cursor expirar
+    """
+
+    def __init__(self, n_items=1000, board_id=DEFAULT_BOARD_ID, token=DEFAULT_TOKEN, seed=0,
+                 latency=0.0, jitter=0.0, max_page_size=500,
+                 complexity_budget=None, complexity_per_item=10,
+                 rate_429=0.0, rate_5xx=0.0, retry_after=1,
+                 fail_after_pages=None, fail_count=1, cursor_ttl=3600):
+        self.items = generate_board(n_items, seed)
+        self.board_id = board_id
+        self.token = token
+        self.latency = latency
+        self.jitter = jitter
+        self.max_page_size = max_page_size
+        self.complexity_budget = complexity_budget
+        self.complexity_per_item = complexity_per_item
+        self.rate_429 = rate_429
+        self.rate_5xx = rate_5xx
+        self.retry_after = retry_after
+        self.fail_after_pages = fail_after_pages
+        self.fail_count = fail_count
+        self.cursor_ttl = cursor_ttl
+
+        self.stats = {"requests": 0, "pages": 0, "bytes": 0, "429": 0, "5xx": 0, "complexity": 0, "mid_crawl": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._budget_used = 0
+        self._budget_window = time.monotonic()
+        self._mid_crawl_left = fail_count
+        self._httpd = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v2"
+
+    # ---------- Cursores ----------
+    def _encode_cursor(self, offset):
+        raw = json.dumps({"b": self.board_id, "o": offset, "t": time.time()}).encode()
+        return base64.urlsafe_b64encode(raw).decode()
+
+    def _decode_cursor(self, cursor):
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except ValueError:
+            return None
+        if data.get("b") != self.board_id or time.time() - data.get("t", 0) > self.cursor_ttl:
+            return None
+        return data["o"]
+
+    # ---------- Requisição ----------
+    def handle(self, headers, body):
+        """Retorna (status, headers extras, payload)."""
+        if self.latency or self.jitter:
+            time.sleep(self.latency + self._rng.uniform(0, self.jitter))
+
+        with self._lock:
+            self.stats["requests"] += 1
+            if self.token and headers.get("Authorization") != self.token:
+                return 401, {}, {"errors": [{"message": "Not Authenticated"}]}
+
+            roll = self._rng.random()
+            if roll < self.rate_429:
+                self.stats["429"] += 1
+                return 429, {"Retry-After": str(self.retry_after)}, {"error_message": "Rate Limit Exceeded"}
+            if roll < self.rate_429 + self.rate_5xx:
+                self.stats["5xx"] += 1
+                return self._rng.choice([500, 502, 503]), {}, {"error_message": "Internal Server Error"}
+            if (self.fail_after_pages is not None and self.stats["pages"] >= self.fail_after_pages
+                    and self._mid_crawl_left > 0):
+                self._mid_crawl_left -= 1
+                self.stats["mid_crawl"] += 1
+                return 500, {}, {"error_message": "Internal Server Error (falha injetada no meio do crawl)"}
+
+        try:
+            query = json.loads(body or b"{}").get("query", "")
+        except ValueError:
+            return 400, {}, {"errors": [{"message": "Invalid JSON"}]}
+        board = _BOARD_RE.search(query)
+        page = _PAGE_RE.search(query)
+        if not board or not page:
+            return 200, {}, {"errors": [{"message": "Stub só suporta boards { items_page(limit, cursor) }"}]}
+        if int(board.group(1)) != self.board_id:
+            return 200, {}, {"data": {"boards": []}}
+
+        limit = int(page.group(1))
+        if limit > self.max_page_size:
+            return 200, {}, {"errors": [{
+                "message": f"limit must be at most {self.max_page_size}",
+                "extensions": {"code": "INVALID_ARGUMENT"},
+            }]}
+
+        with self._lock:
+            if self.complexity_budget is not None:
+                now = time.monotonic()
+                if now - self._budget_window >= 60:
+                    self._budget_window, self._budget_used = now, 0
+                cost = limit * self.complexity_per_item
+                if self._budget_used + cost > self.complexity_budget:
+                    self.stats["complexity"] += 1
+                    return 200, {}, {"errors": [{
+                        "message": "Complexity budget exhausted",
+                        "extensions": {
+                            "code": "COMPLEXITY_BUDGET_EXHAUSTED",
+                            "retry_in_seconds": max(1, int(60 - (now - self._budget_window))),
+                        },
+                    }]}
+                self._budget_used += cost
+
+        offset = 0
+        if page.group(2) is not None:
+            offset = self._decode_cursor(page.group(2))
+            if offset is None:
+                return 200, {}, {"errors": [{
+                    "message": "CursorExpiredError: cursor inválido ou expirado",
+                    "extensions": {"code": "CursorExpiredError"},
+                }]}
+
+        chunk = self.items[offset:offset + limit]
+        next_offset = offset + limit
+        cursor = self._encode_cursor(next_offset) if next_offset < len(self.items) else None
+        with self._lock:
+            self.stats["pages"] += 1
+        return 200, {}, {"data": {"boards": [{"items_page": {"cursor": cursor, "items": chunk}}]}}
+
+    # ---------- Servidor ----------
+    def start(self, host="127.0.0.1", port=0):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0) or 0)
+                status, extra, payload = stub.handle(self.headers, self.rfile.read(length))
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                with stub._lock:
+                    stub.stats["bytes"] += len(body)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for k, v in extra.items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stand-in local da API do Monday (items_page).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--board-id", type=int, default=DEFAULT_BOARD_ID)
+    parser.add_argument("--token", default=DEFAULT_TOKEN, help="token exigido no header Authorization ('' desativa)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--max-page-size", type=int, default=500)
+    parser.add_argument("--complexity-budget", type=int, default=None)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-5xx", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--fail-after-pages", type=int, default=None)
+    parser.add_argument("--fail-count", type=int, default=1)
+    parser.add_argument("--cursor-ttl", type=int, default=3600)
+    args = parser.parse_args(argv)
+
+    stub = MondayStub(
+        n_items=args.items, board_id=args.board_id, token=args.token, seed=args.seed,
+        latency=args.latency, jitter=args.jitter, max_page_size=args.max_page_size,
+        complexity_budget=args.complexity_budget, rate_429=args.rate_429, rate_5xx=args.rate_5xx,
+        retry_after=args.retry_after, fail_after_pages=args.fail_after_pages,
+        fail_count=args.fail_count, cursor_ttl=args.cursor_ttl,
+    ).start(args.host, args.port)
+    print(f"✅ Monday stub em {stub.url} · {len(stub.items)} itens · token={args.token!r}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+# snapshot_server.py — serviço local read-only da fila (itens + targets) a partir de um snapshot em memória
+#
+# Um único processo sincroniza com o Monday e os PCs do laboratório consultam este serviço
+# em vez da API: 50 clientes atualizando custam 1 crawl e praticamente zero trabalho por cliente
+# (corpos pré-serializados, ETag/If-None-Match e gzip).
+#
+#   python snapshot_server.py serve --port 8765 --interval 300
+#   python snapshot_server.py pull --url http://servidor:8765 --format export
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import pandas as pd
+import requests
+
+from fila import (
+    MONDAY_EXPORT_FILE, QUEUE_COLUMNS,
+    normalize_items, add_targets_to_reparos,
+)
+from jsonExport import dataMondaytoJson
+
+
+DEFAULT_PORT = 8765
+DEFAULT_START_DATE = "28/08/2025"
+DEFAULT_MAX_PER_WEEK = 5
+MAX_CACHED_VIEWS = 32   # combinações (data inicial, máx/semana, formato) por snapshot
+
+
+# ==============================
+# Snapshot
+# ==============================
+def _entity(body: bytes, content_type: str) -> dict:
+    """Representação pronta para servir: corpo cru, corpo gzip e ETag."""
+    etag = '"%s"' % hashlib.sha1(body).hexdigest()
+    return {
+        "body": body,
+        "gzip": gzip.compress(body, compresslevel=6),
+        "etag": etag,
+        "content_type": content_type,
+    }
+
+
+class QueueSnapshot:
+    """Snapshot imutável do board: itens crus + fila normalizada. Views são calculadas uma vez e cacheadas."""
+
+    def __init__(self, items, synced_at=None):
+        self.items = items
+        self.synced_at = synced_at or datetime.now()
+        self.df = normalize_items(items)
+        self._views = {}
+        self._lock = threading.Lock()
+        self.export = _entity(
+            json.dumps({"items": items}, ensure_ascii=False).encode("utf-8"),
+            "application/json; charset=utf-8",
+        )
+
+    def queue(self, start_date_str=DEFAULT_START_DATE, max_per_week=DEFAULT_MAX_PER_WEEK, fmt="json"):
+        key = (start_date_str, max_per_week, fmt)
+        with self._lock:
+            view = self._views.get(key)
+            if view is None:
+                if len(self._views) >= MAX_CACHED_VIEWS:
+                    self._views.clear()
+                view = self._build_view(start_date_str, max_per_week, fmt)
+                self._views[key] = view
+        return view
+
+    def _build_view(self, start_date_str, max_per_week, fmt):
+        df = add_targets_to_reparos(self.df, start_date_str=start_date_str, max_per_week=max_per_week)
+        df = df.reindex(columns=QUEUE_COLUMNS).copy()
+        df["due_date"] = pd.to_datetime(df["due_date"], errors="coerce").dt.strftime("%Y-%m-%d")
+        df = df.astype(object).where(df.notna(), None)
+
+        if fmt == "csv":
+            return _entity(df.to_csv(index=False).encode("utf-8"), "text/csv; charset=utf-8")
+
+        payload = {
+            "synced_at": self.synced_at.isoformat(timespec="seconds"),
+            "start_date": start_date_str,
+            "max_per_week": max_per_week,
+            "count": len(df),
+            "items": df.to_dict(orient="records"),
+        }
+        return _entity(json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8")
+
+
+# ==============================
+# Servidor
+# ==============================
+class SnapshotServer:
+    """
+    Mantém o snapshot atual e sincroniza com o Monday.
+    - Só um crawl por vez; pedidos de sync concorrentes esperam o crawl em andamento.
+    - Pedidos de sync mais recentes que `min_sync_age` segundos são ignorados.
+    """
+
+    def __init__(self, fetcher=None, source_file=None, interval=0, min_sync_age=60):
+        self.fetcher = fetcher or dataMondaytoJson()
+        self.source_file = source_file
+        self.interval = interval
+        self.min_sync_age = min_sync_age
+        self.snapshot = None
+        self.last_sync = 0.0
+        self.last_error = None
+        self.syncs = 0
+        self._sync_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def load_file(self, path=MONDAY_EXPORT_FILE):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        self.snapshot = QueueSnapshot(data.get("items", []))
+        self.last_sync = time.monotonic()
+        print(f"✅ Snapshot carregado de {path}: {len(self.snapshot.items)} itens")
+
+    def sync(self, force=False):
+        requested = time.monotonic()
+        with self._sync_lock:
+            # outro pedido já sincronizou enquanto este esperava
+            if self.last_sync >= requested:
+                return False
+            if not force and self.snapshot is not None and requested - self.last_sync < self.min_sync_age:
+                return False
+            try:
+                if self.source_file:
+                    self.load_file(self.source_file)
+                else:
+                    final_data = self.fetcher.mondayToJson()
+                    if not final_data:
+                        raise RuntimeError("crawl do Monday não retornou dados")
+                    self.snapshot = QueueSnapshot(final_data.get("items", []))
+                    self.last_sync = time.monotonic()
+                self.syncs += 1
+                self.last_error = None
+                return True
+            except Exception as e:
+                # mantém o snapshot anterior
+                self.last_error = str(e)
+                print(f"❌ Falha ao sincronizar: {e}")
+                return False
+
+    def _sync_loop(self):
+        while not self._stop.wait(self.interval):
+            self.sync(force=True)
+
+    def status(self) -> dict:
+        snap = self.snapshot
+        return {
+            "synced_at": snap.synced_at.isoformat(timespec="seconds") if snap else None,
+            "items": len(snap.items) if snap else 0,
+            "queue": len(snap.df) if snap else 0,
+            "syncs": self.syncs,
+            "last_error": self.last_error,
+        }
+
+    def serve(self, host="0.0.0.0", port=DEFAULT_PORT):
+        if self.snapshot is None:
+            self.sync(force=True)
+        if self.interval:
+            threading.Thread(target=self._sync_loop, daemon=True).start()
+
+        handler = type("BoundSnapshotHandler", (SnapshotHandler,), {"server_state": self})
+        httpd = ThreadingHTTPServer((host, port), handler)
+        print(f"✅ Servindo fila em http://{host}:{port} (queue.json, queue.csv, export.json)")
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._stop.set()
+            httpd.server_close()
+
+
+class SnapshotHandler(BaseHTTPRequestHandler):
+    server_state = None   # SnapshotServer, definido em SnapshotServer.serve
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        snap = self.server_state.snapshot
+
+        if url.path == "/status":
+            return self._send_json(self.server_state.status())
+        if snap is None:
+            return self._send_json({"error": "snapshot indisponível"}, code=503)
+
+        if url.path in ("/", "/queue.json", "/queue.csv"):
+            try:
+                start = params.get("start", [DEFAULT_START_DATE])[0]
+                datetime.strptime(start, "%d/%m/%Y")
+                max_per_week = int(params.get("max", [DEFAULT_MAX_PER_WEEK])[0])
+                if max_per_week < 1:
+                    raise ValueError(max_per_week)
+            except ValueError:
+                return self._send_json({"error": "parâmetros inválidos (start=DD/MM/AAAA, max>=1)"}, code=400)
+            fmt = "csv" if url.path == "/queue.csv" else "json"
+            return self._send_entity(snap.queue(start, max_per_week, fmt))
+        if url.path == "/export.json":
+            return self._send_entity(snap.export)
+
+        self._send_json({"error": "não encontrado"}, code=404)
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/sync":
+            return self._send_json({"error": "não encontrado"}, code=404)
+        synced = self.server_state.sync()
+        self._send_json(dict(self.server_state.status(), synced=synced))
+
+    def _send_entity(self, entity):
+        use_gzip = "gzip" in self.headers.get("Accept-Encoding", "")
+        etag = entity["etag"][:-1] + '-gz"' if use_gzip else entity["etag"]
+
+        if_none_match = self.headers.get("If-None-Match", "")
+        tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",") if t.strip()}
+        if "*" in tags or entity["etag"] in tags or etag in tags:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            return
+
+        body = entity["gzip"] if use_gzip else entity["body"]
+        self.send_response(200)
+        self.send_header("Content-Type", entity["content_type"])
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, obj, code=200):
+        body = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+# ==============================
+# Cliente
+# ==============================
+class SnapshotClient:
+    """Consome o snapshot server com If-None-Match: 304 reaproveita o último DataFrame sem reprocessar."""
+
+    def __init__(self, base_url, timeout=15, sync_timeout=300):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.sync_timeout = sync_timeout   # POST /sync espera o crawl terminar
+        self.session = requests.Session()
+        self._etag = None
+        self._key = None
+        self._df = None
+        self._export_etag = None
+        self._items = None
+
+    def fetch_queue(self, start_date_str=DEFAULT_START_DATE, max_per_week=DEFAULT_MAX_PER_WEEK):
+        """Retorna (df, changed). O df já vem ordenado e com a coluna 'target'."""
+        key = (start_date_str, int(max_per_week))
+        headers = {}
+        if self._etag and self._key == key:
+            headers["If-None-Match"] = self._etag
+
+        r = self.session.get(
+            f"{self.base_url}/queue.json",
+            params={"start": start_date_str, "max": int(max_per_week)},
+            headers=headers, timeout=self.timeout,
+        )
+        if r.status_code == 304 and self._df is not None:
+            return self._df, False
+        r.raise_for_status()
+
+        df = pd.DataFrame(r.json().get("items", []), columns=QUEUE_COLUMNS)
+        df["due_date"] = pd.to_datetime(df["due_date"], errors="coerce")
+        self._df, self._etag, self._key = df, r.headers.get("ETag"), key
+        return df, True
+
+    def fetch_items(self):
+        """Retorna (items, changed) do export cru; 304 reaproveita a última lista."""
+        headers = {"If-None-Match": self._export_etag} if self._export_etag else {}
+        r = self.session.get(f"{self.base_url}/export.json", headers=headers, timeout=self.timeout)
+        if r.status_code == 304 and self._items is not None:
+            return self._items, False
+        r.raise_for_status()
+        self._items, self._export_etag = r.json().get("items", []), r.headers.get("ETag")
+        return self._items, True
+
+    def fetch_export(self, path=MONDAY_EXPORT_FILE):
+        """Baixa o export cru (mesmo formato do monday_export_all.json) e salva em `path`."""
+        r = self.session.get(f"{self.base_url}/export.json", timeout=self.timeout)
+        r.raise_for_status()
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(r.content)
+        os.replace(tmp, path)
+        return path
+
+    def request_sync(self):
+        r = self.session.post(f"{self.base_url}/sync", timeout=self.sync_timeout)
+        r.raise_for_status()
+        return r.json()
+
+
+# ==============================
+# CLI
+# ==============================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Snapshot server da fila de reparos (Monday).")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_serve = sub.add_parser("serve", help="sincroniza com o Monday e serve a fila via HTTP")
+    p_serve.add_argument("--host", default="0.0.0.0")
+    p_serve.add_argument("--port", type=int, default=DEFAULT_PORT)
+    p_serve.add_argument("--interval", type=int, default=0,
+                         help="segundos entre sincronizações automáticas (0 = só sob demanda)")
+    p_serve.add_argument("--min-sync-age", type=int, default=60,
+                         help="ignora POST /sync se o snapshot tiver menos que N segundos")
+    p_serve.add_argument("--source-file", default=None,
+                         help="serve um export local em vez de consultar a API")
+
+    p_pull = sub.add_parser("pull", help="baixa a fila/export de um snapshot server")
+    p_pull.add_argument("--url", default=os.environ.get("OPX_SNAPSHOT_URL", f"http://localhost:{DEFAULT_PORT}"))
+    p_pull.add_argument("--format", choices=["json", "csv", "export"], default="export")
+    p_pull.add_argument("--start", default=DEFAULT_START_DATE)
+    p_pull.add_argument("--max", type=int, default=DEFAULT_MAX_PER_WEEK)
+    p_pull.add_argument("-o", "--output", default=None)
+
+    args = parser.parse_args(argv)
+
+    if args.cmd == "serve":
+        server = SnapshotServer(source_file=args.source_file, interval=args.interval,
+                                min_sync_age=args.min_sync_age)
+        server.serve(host=args.host, port=args.port)
+        return
+
+    client = SnapshotClient(args.url)
+    if args.format == "export":
+        path = client.fetch_export(args.output or MONDAY_EXPORT_FILE)
+        print(f"✅ Export salvo em {path}")
+        return
+
+    r = client.session.get(f"{client.base_url}/queue.{args.format}",
+                           params={"start": args.start, "max": args.max}, timeout=client.timeout)
+    r.raise_for_status()
+    if args.output:
+        with open(args.output, "wb") as f:
+            f.write(r.content)
+        print(f"✅ Fila salva em {args.output}")
+    else:
+        print(r.text)
+
+
+if __name__ == "__main__":
+    main()